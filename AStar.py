@@ -1,7 +1,24 @@
-from typing import Union, List
+import heapq
+import math
+from typing import Callable, Union, List, Tuple
 import numpy as np
-from matplotlib import pyplot as plt
-from matplotlib.patches import RegularPolygon
+from numba import njit
+
+# Optional compiled search loop, see astar_core.pyx
+try:
+    from astar_core import astar as compiled_astar
+except ImportError:
+    compiled_astar = None
+
+SQRT2 = math.sqrt(2)
+
+# (dx, dy) offsets of the 8 neighbors of a square
+_NEIGHBORS = tuple((i, j) for i in (-1, 0, 1) for j in (-1, 0, 1) if (i, j) != (0, 0))
+
+# Same offsets as arrays, with the cost of the step to each neighbor
+OFFS_X = np.array([dx for dx, _ in _NEIGHBORS], dtype=np.int32)
+OFFS_Y = np.array([dy for _, dy in _NEIGHBORS], dtype=np.int32)
+STEP = np.where((OFFS_X != 0) & (OFFS_Y != 0), SQRT2, 1.0)
 
 
 class Node:
@@ -11,31 +28,9 @@ class Node:
         self.x = x_pos
         self.y = y_pos
 
-        self.parent_node = None
-
-        self.g_cost = 0
-        self.h_cost = 0
-
-    @property
-    def F_cost(self) -> int:
-        return self.g_cost + self.h_cost
-
     def __repr__(self):
         return f"{self.x, self.y}"
 
-    def __lt__(self, other):
-        if self.F_cost == other.F_cost:
-            return self.g_cost < other.g_cost
-        return self.F_cost < other.F_cost
-
-    def __gt__(self, other):
-        if self.F_cost == other.F_cost:
-            return self.g_cost > other.g_cost
-        return self.F_cost > other.F_cost
-
-    def __hash__(self):
-        return hash((self.x, self.y, self.h_cost, self.h_cost, self.F_cost, self.parent_node))
-
 
 class GridNodes:
     """ Create a grid on which the A* algorithm takes place """
@@ -44,230 +39,210 @@ class GridNodes:
         self.width = width
         self.height = height
 
-        self.grid = np.empty((width, height), dtype=object)
-        for x in range(0, width):
-            for y in range(0, height):
-                self.grid[x][y] = Node(x, y)
-
-    def get_node(self, x: int, y: int) -> Union[Node, None]:
-        if x + 1 > self.width or y + 1 > self.height or x < 0 or y < 0:
-            return None
-
-        return self.grid[x][y]
-
 
-class A_Star:
-    EDGE_COLOR = "k"
-    SQUARE_COLOR = "gray"
-    BLOC_NODE = "k"
-    OPENLIST_COLOR = "tab:blue"
-    START_NODE = "yellow"
-    END_NODE = "tab:green"
-    CLOSED_COLOR = "tab:red"
+class AStarSolver:
+    """ Run the A* algorithm on a grid, without any visualization """
 
-    def __init__(self, grid_nodes: GridNodes, start_node, end_node):
+    def __init__(self, grid_nodes: GridNodes, start_node, end_node,
+                 on_step: Union[Callable[[int, int, bool, List[Tuple[int, int]]], None], None] = None):
         self.grid_nodes = grid_nodes
         self.start_node = start_node
         self.end_node = end_node
+        # Called as on_step(x, y, terminal, opened) once (x, y) is closed and the squares in <opened> are pushed,
+        # and with terminal=True when the search stops
+        self.on_step = on_step
 
         self.bloc_nodes = []
+        self.bloc_set = set()
         self.openList = []
-        self.closedSet = set()
+        self._tiebreak = 0
 
         self.width = self.grid_nodes.width
         self.height = self.grid_nodes.height
-        self.iter_ = 0
-
-        self.A_started = False
-        self.selecting_square = True
-
-        self._init_matplotlib_figure()
-
-    def _init_matplotlib_figure(self):
-        """ Initialize the matplotlib figure and the events """
-
-        # Create figure and axes
-        self.fig = plt.figure(figsize=((self.width + 2) / 3, (self.height + 2) / 3))
-        self.ax = self.fig.add_axes((0.05, 0.05, 0.9, 0.9), aspect="equal", frameon=False,
-                                    xlim=(-0.05, self.width + 0.05), ylim=(-0.05, self.height + 0.05))
-
-        # Remove formatter
-        for axis in (self.ax.xaxis, self.ax.yaxis):
-            axis.set_major_formatter(plt.NullFormatter())
-            axis.set_major_locator(plt.NullLocator())
-
-        # Create grid of squares
-        self.squares = np.empty((self.width, self.height), dtype=object)
-        for i in range(self.width):
-            for j in range(self.height):
-                self.squares[i][j] = RegularPolygon((i + 0.5, j + 0.5), numVertices=4, radius=0.5 * np.sqrt(2),
-                                                    orientation=np.pi / 4, ec=self.EDGE_COLOR, fc=self.SQUARE_COLOR)
-
-        # Add patches
-        for sq in self.squares.flat:
-            self.ax.add_patch(sq)
+        self._check_in_grid(start_node, "start_node")
+        self._check_in_grid(end_node, "end_node")
 
-        # Add start node and end node
-        self.squares[start_node.x, start_node.y].set_facecolor(self.START_NODE)
-        self.squares[end_node.x, end_node.y].set_facecolor(self.END_NODE)
+        # Bitmaps of the bloc squares (filled when the search starts) and closed squares
+        self.blocked = np.zeros((self.width, self.height), dtype=np.bool_)
+        self.closed = np.zeros((self.width, self.height), dtype=np.uint8)
 
-        # Create event hook for mouse clicks
-        self.fig.canvas.mpl_connect("button_press_event", self._mouse_button_press)
-        self.fig.canvas.mpl_connect("motion_notify_event", self._mouse_button_press)
-        self.fig.canvas.mpl_connect('key_press_event', self._on_key_press)
+        # Scratch buffers for the (x, y) and (F_cost, g_cost) of the neighbors to push
+        self._neighbors = np.empty((len(_NEIGHBORS), 2), dtype=np.int32)
+        self._costs = np.empty((len(_NEIGHBORS), 2), dtype=np.float64)
 
-        # Show
-        plt.show()
-
-    def _on_key_press(self, event):
-        """ If event is spacebar """
+        # Best known <g_cost> and parent (x, y) of each square, (-1, -1) when it has none
+        self.g = np.full((self.width, self.height), np.inf)
+        self.parent = np.full((self.width, self.height, 2), -1, dtype=np.int32)
+        self.iter_ = 0
 
-        if event.key == " " and self.A_started is False:
-            self.A_started = True
-            self.run_A_star()
+    def _check_in_grid(self, node, name: str):
+        """ Raise a ValueError if <node> is off the grid, the search doesn't check its bounds """
 
-    def _mouse_button_press(self, event):
-        """ On mouse left and right click event on matplotlib draw bloc nodes or remove them """
+        if not (0 <= node.x < self.width and 0 <= node.y < self.height):
+            raise ValueError(f"{name} {node} is outside the {self.width}x{self.height} grid")
 
-        if self.A_started or event.xdata is None or event.ydata is None:
-            return
+    def add_bloc(self, x: int, y: int) -> bool:
+        """ Add a bloc node, return False if the square can't be blocked """
 
-        i, j = int(event.xdata), int(event.ydata)
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return False
 
-        # Left mouse button: draw bloc nodes
-        if event.button == 1 and event.inaxes:
-            self._click_square(i, j)
+        if (x, y) == (self.start_node.x, self.start_node.y) or (x, y) == (self.end_node.x, self.end_node.y):
+            return False
 
-        # Right mouse button: remove blocs
-        if event.button == 3 and event.inaxes:
-            self._unclick_square(i, j)
+        if (x, y) in self.bloc_set:
+            return False
 
-        self.fig.canvas.draw()
+        self.bloc_nodes.append(Node(x, y))
+        self.bloc_set.add((x, y))
+        return True
 
-    def _unclick_square(self, i, j):
-        if self.end_node.x == i and self.end_node.y == j:
-            return
+    def remove_bloc(self, x: int, y: int) -> bool:
+        """ Remove a bloc node, return False if there was none """
 
-        if self.start_node.x == i and self.start_node.y == j:
-            return
+        if (x, y) not in self.bloc_set:
+            return False
 
         for node in self.bloc_nodes:
-            if node.x == i and node.y == j:
-                self.squares[i, j].set_facecolor(self.SQUARE_COLOR)
+            if node.x == x and node.y == y:
                 self.bloc_nodes.remove(node)
-                return
-
-    def _click_square(self, i, j):
-        if self.end_node.x == i and self.end_node.y == j:
-            return
+                self.bloc_set.discard((x, y))
+                return True
 
-        if self.start_node.x == i and self.start_node.y == j:
-            return
+        return False
 
-        self.squares[i, j].set_facecolor(self.BLOC_NODE)
-        self.bloc_nodes.append(Node(i, j))
+    def get_path(self) -> List[Tuple[int, int]]:
+        """ Walk the parents back from the end node to the start node """
 
-    def get_valid_nodes(self, current_node: Node) -> List[Node]:
-        """ Retrieve a valid neighbor node """
+        x, y = self.end_node.x, self.end_node.y
+        path = [(x, y)]
+        while self.parent[x, y, 0] != -1:
+            x, y = self.parent[x, y].tolist()
+            path.append((x, y))
 
-        returned_nodes = []
-        for i in range(-1, 2):
-            for j in range(-1, 2):
-                if i == 0 and j == 0:
-                    continue
+        return path[::-1]
 
-                eval_node = self.grid_nodes.get_node(current_node.x + i, current_node.y + j)
+    def _run_compiled_A_star(self) -> Union[List[Tuple[int, int]], None]:
+        """ Run the whole search in the compiled core, it has no intermediate steps to report """
 
-                if eval_node is None or eval_node in self.closedSet:
-                    continue
+        expanded = compiled_astar(self.blocked.view(np.uint8), self.closed, self.g, self.start_node.x,
+                                  self.start_node.y, self.end_node.x, self.end_node.y, self.parent)
+        self.iter_ = int(np.count_nonzero(self.closed))
 
-                if any(node.x == eval_node.x and node.y == eval_node.y for node in self.bloc_nodes):
-                    continue
-
-                returned_nodes.append(eval_node)
-
-        return returned_nodes
+        if expanded == -1:
+            print("No valid path found snif :(.")
+            return None
 
-    def plot_path(self, current_node):
-        """ Plot the path at each iteration """
+        print("FOUND :D")
+        return self.get_path()
 
-        if current_node.x == start_node.x and current_node.y == start_node.y or \
-                current_node.x == end_node.x and current_node.y == end_node.y:
-            return
+    def run_A_star(self) -> Union[List[Tuple[int, int]], None]:
+        """ Run the actual algorithm """
 
-        for node in self.openList:
-            if node.x == start_node.x and node.y == start_node.y or \
-                    node.x == end_node.x and node.y == end_node.y:
-                continue
-            self.squares[node.x, node.y].set_facecolor(self.OPENLIST_COLOR)
+        # The nodes are public attributes, check them again in case they were moved since __init__
+        self._check_in_grid(self.start_node, "start_node")
+        self._check_in_grid(self.end_node, "end_node")
 
-        for node in self.closedSet:
-            if node.x == start_node.x and node.y == start_node.y or \
-                    node.x == end_node.x and node.y == end_node.y:
-                continue
-            self.squares[node.x, node.y].set_facecolor(self.CLOSED_COLOR)
+        sx, sy = self.start_node.x, self.start_node.y
+        ex, ey = self.end_node.x, self.end_node.y
+        on_step = self.on_step
 
-        self.squares[current_node.x, current_node.y].set_facecolor(self.CLOSED_COLOR)
+        # Reset the state left by a previous search
+        self.openList = []
+        self._tiebreak = 0
+        self.closed[:] = 0
+        self.g[:] = np.inf
+        self.parent[:] = -1
+        self.iter_ = 0
 
-        self.ax.set_title("A* Algorithm Iteration: {}".format(self.iter_))
-        plt.pause(0.001)
-        self.fig.canvas.draw()
+        self.blocked[:] = False
+        for node in self.bloc_nodes:
+            self.blocked[node.x, node.y] = True
 
-    def run_A_star(self) -> Node:
-        """ Run the actual algorithm """
+        # The compiled core runs the search in one call, keep the Python loop when steps are watched
+        if compiled_astar is not None and on_step is None:
+            return self._run_compiled_A_star()
 
-        self.openList.append(start_node)
+        # Heap entries are (F_cost, g_cost, tiebreak, x, y): the counter keeps ordering stable on ties
+        heapq.heappush(self.openList, (0.0, 0.0, 0, sx, sy))
+        self.g[sx, sy] = 0.0
 
         while len(self.openList) > 0:
-            self.openList.sort()
-
-            current_node = self.openList[0]
-            self.openList.pop(0)
+            _, g_cost, _, x, y = heapq.heappop(self.openList)
 
-            self.plot_path(current_node)
+            # Lazy deletion: skip stale entries superseded by a cheaper push
+            if g_cost > self.g[x, y]:
+                continue
 
-            if (current_node.x, current_node.y) == (self.end_node.x, self.end_node.y):
+            if x == ex and y == ey:
+                if on_step is not None:
+                    on_step(x, y, True, [])
                 print("FOUND :D")
-                return self.end_node
+                return self.get_path()
+
+            # Add to closed squares
+            self.closed[x, y] = 1
 
-            # Add to closedSet
-            self.closedSet.add(current_node)
+            # Relax the valid neighbor nodes, the kernel updates <g_cost> and <parent> and returns the ones to push
+            count = relax_neighbors(x, y, ex, ey, self.blocked, self.closed, self.g, self.parent, self._neighbors,
+                                    self._costs)
+            neighbors, costs = self._neighbors[:count].tolist(), self._costs[:count].tolist()
 
-            # Check valid neighbor node
-            all_valid_nodes = self.get_valid_nodes(current_node)
+            # Push new entries instead of a decrease-key, the old ones are skipped when popped
+            for (nx, ny), (f_cost, new_g_cost) in zip(neighbors, costs):
+                self._tiebreak += 1
+                heapq.heappush(self.openList, (f_cost, new_g_cost, self._tiebreak, nx, ny))
 
-            for valid_node in all_valid_nodes:
-                if valid_node is None:
-                    raise Exception("No valid node available, path not found.")
+            if on_step is not None:
+                on_step(x, y, False, list(map(tuple, neighbors)))
 
-                # Calculate <g_cost> from start
-                valid_node.g_cost = current_node.g_cost + get_distance(current_node, valid_node)
+            self.iter_ += 1
 
+        if on_step is not None:
+            on_step(x, y, True, [])
+        print("No valid path found snif :(.")
 
-                # Calculate <h_cost> to end
-                valid_node.h_cost = get_distance(valid_node, end_node)
 
-                if valid_node not in self.openList:
-                    valid_node.parent_node = current_node
-                    self.openList.append(valid_node)
+@njit(cache=True)
+def octile(x1: int, y1: int, x2: int, y2: int) -> float:
+    """ Octile distance: exact cost on an empty grid with unit cardinal and sqrt(2) diagonal moves """
 
-            self.iter_ += 1
+    dx = abs(x1 - x2)
+    dy = abs(y1 - y2)
+
+    return (dx + dy) + (SQRT2 - 2) * min(dx, dy)
 
-        print("No valid path found snif :(.")
 
+@njit(cache=True)
+def relax_neighbors(x: int, y: int, ex: int, ey: int, blocked: np.ndarray, closed: np.ndarray, g: np.ndarray,
+                    parent: np.ndarray, out_xy: np.ndarray, out_costs: np.ndarray) -> int:
+    """ Update the <g> and <parent> of the expandable neighbors of (x, y) whose <g_cost> improves, write their
+    (x, y) in <out_xy> and (F_cost, g_cost) in <out_costs> and return how many there are """
 
-def get_distance(current_node: Node, valid_node: Node):
-    """ Manhattan/cityblock distance """
+    width, height = blocked.shape
+    count = 0
+    for k in range(OFFS_X.shape[0]):
+        nx, ny = x + OFFS_X[k], y + OFFS_Y[k]
+        if not (0 <= nx < width and 0 <= ny < height):
+            continue
 
-    return abs(current_node.x - valid_node.x) + abs(current_node.y - valid_node.y)
+        if blocked[nx, ny] or closed[nx, ny]:
+            continue
 
+        # Calculate <g_cost> from start, only keep it if it improves the best one known
+        new_g_cost = g[x, y] + STEP[k]
+        if new_g_cost >= g[nx, ny]:
+            continue
 
-if __name__ == "__main__":
-    grid_nodes = GridNodes(15, 15)
+        g[nx, ny] = new_g_cost
+        parent[nx, ny, 0] = x
+        parent[nx, ny, 1] = y
 
-    start_node: Node = Node(2, 2)
-    end_node = Node(12, 12)
+        out_xy[count, 0] = nx
+        out_xy[count, 1] = ny
+        out_costs[count, 0] = new_g_cost + octile(nx, ny, ex, ey)
+        out_costs[count, 1] = new_g_cost
+        count += 1
 
-    A_Star(grid_nodes, start_node, end_node)
+    return count
 
-    plt.show()
@@ -0,0 +1,146 @@
+from typing import List, Tuple
+
+import numpy as np
+from matplotlib import pyplot as plt
+from matplotlib.colors import to_rgba
+
+from AStar import AStarSolver, GridNodes, Node
+
+
+def _rgba(color: str) -> np.ndarray:
+    """ Convert a matplotlib color to an RGBA uint8 pixel """
+
+    return np.round(np.multiply(to_rgba(color), 255)).astype(np.uint8)
+
+
+class AStarVisualizer(AStarSolver):
+    """ Draw the A* algorithm with matplotlib: click to add/remove blocs, spacebar to run """
+
+    EDGE_COLOR = "k"
+    SQUARE_RGBA = _rgba("gray")
+    BLOC_RGBA = _rgba("k")
+    OPENLIST_RGBA = _rgba("tab:blue")
+    START_RGBA = _rgba("yellow")
+    END_RGBA = _rgba("tab:green")
+    CLOSED_RGBA = _rgba("tab:red")
+
+    def __init__(self, grid_nodes: GridNodes, start_node, end_node, draw_every: int = 10):
+        super().__init__(grid_nodes, start_node, end_node, on_step=self.plot_path)
+        self.draw_every = draw_every
+
+        # Squares opened and closed since the last draw, only those are repainted
+        self._newly_opened = []
+        self._newly_closed = []
+
+        self.A_started = False
+        self.selecting_square = True
+
+        self._init_matplotlib_figure()
+
+    def _init_matplotlib_figure(self):
+        """ Initialize the matplotlib figure and the events """
+
+        # Create figure and axes
+        self.fig = plt.figure(figsize=((self.width + 2) / 3, (self.height + 2) / 3))
+        self.ax = self.fig.add_axes((0.05, 0.05, 0.9, 0.9), aspect="equal", frameon=False,
+                                    xlim=(-0.05, self.width + 0.05), ylim=(-0.05, self.height + 0.05))
+
+        # Remove formatter
+        for axis in (self.ax.xaxis, self.ax.yaxis):
+            axis.set_major_formatter(plt.NullFormatter())
+            axis.set_major_locator(plt.NullLocator())
+
+        # Create a single RGBA image of the squares, indexed [y, x], and draw the squares edges on top of it
+        self.color_img = np.tile(self.SQUARE_RGBA, (self.height, self.width, 1))
+        self.im = self.ax.imshow(self.color_img, origin="lower", extent=(0, self.width, 0, self.height),
+                                 interpolation="nearest")
+        self.ax.vlines(range(self.width + 1), 0, self.height, colors=self.EDGE_COLOR)
+        self.ax.hlines(range(self.height + 1), 0, self.width, colors=self.EDGE_COLOR)
+        self.ax.set_xlim(-0.05, self.width + 0.05)
+        self.ax.set_ylim(-0.05, self.height + 0.05)
+
+        # Add start node and end node
+        self.color_img[self.start_node.y, self.start_node.x] = self.START_RGBA
+        self.color_img[self.end_node.y, self.end_node.x] = self.END_RGBA
+        self.im.set_data(self.color_img)
+
+        # Create event hook for mouse clicks
+        self.fig.canvas.mpl_connect("button_press_event", self._mouse_button_press)
+        self.fig.canvas.mpl_connect("motion_notify_event", self._mouse_button_press)
+        self.fig.canvas.mpl_connect('key_press_event', self._on_key_press)
+
+        # Show
+        plt.show()
+
+    def _on_key_press(self, event):
+        """ If event is spacebar """
+
+        if event.key == " " and self.A_started is False:
+            self.A_started = True
+            self.run_A_star()
+
+    def _mouse_button_press(self, event):
+        """ On mouse left and right click event on matplotlib draw bloc nodes or remove them """
+
+        if self.A_started or event.xdata is None or event.ydata is None:
+            return
+
+        i, j = int(event.xdata), int(event.ydata)
+
+        # Left mouse button: draw bloc nodes
+        if event.button == 1 and event.inaxes:
+            self._click_square(i, j)
+
+        # Right mouse button: remove blocs
+        if event.button == 3 and event.inaxes:
+            self._unclick_square(i, j)
+
+        self.im.set_data(self.color_img)
+        self.fig.canvas.draw()
+
+    def _unclick_square(self, i, j):
+        if self.remove_bloc(i, j):
+            self.color_img[j, i] = self.SQUARE_RGBA
+
+    def _click_square(self, i, j):
+        if self.add_bloc(i, j):
+            self.color_img[j, i] = self.BLOC_RGBA
+
+    def plot_path(self, current_x: int, current_y: int, terminal: bool, opened: List[Tuple[int, int]]):
+        """ Plot the path every <draw_every> iterations and on the last one """
+
+        self._newly_opened.extend(opened)
+        self._newly_closed.append((current_x, current_y))
+
+        if self.iter_ % self.draw_every and not terminal:
+            return
+
+        start_xy = (self.start_node.x, self.start_node.y)
+        end_xy = (self.end_node.x, self.end_node.y)
+
+        for xy in self._newly_opened:
+            if xy == start_xy or xy == end_xy:
+                continue
+            self.color_img[xy[1], xy[0]] = self.OPENLIST_RGBA
+
+        for xy in self._newly_closed:
+            if xy == start_xy or xy == end_xy:
+                continue
+            self.color_img[xy[1], xy[0]] = self.CLOSED_RGBA
+
+        self._newly_opened.clear()
+        self._newly_closed.clear()
+
+        self.im.set_data(self.color_img)
+        self.ax.set_title("A* Algorithm Iteration: {}".format(self.iter_))
+        plt.pause(0.001)
+        self.fig.canvas.draw()
+
+
+if __name__ == "__main__":
+    grid_nodes = GridNodes(15, 15)
+
+    start_node: Node = Node(2, 2)
+    end_node = Node(12, 12)
+
+    AStarVisualizer(grid_nodes, start_node, end_node)
@@ -0,0 +1,159 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, initializedcheck=False
+""" Compiled A* search loop, build it in place with `cythonize -i astar_core.pyx` """
+
+from libc.math cimport sqrt
+from libc.stdlib cimport abs, malloc, realloc, free
+
+
+cdef double SQRT2 = sqrt(2.0)
+
+
+cdef struct Entry:
+    double f
+    double g
+    long long tiebreak
+    int x
+    int y
+
+
+cdef inline bint _less(Entry* a, Entry* b) noexcept nogil:
+    if a.f != b.f:
+        return a.f < b.f
+    if a.g != b.g:
+        return a.g < b.g
+    return a.tiebreak < b.tiebreak
+
+
+cdef inline void _push(Entry* heap, Py_ssize_t size, Entry entry) noexcept nogil:
+    """ Sift <entry> up from the end of a heap holding <size> entries """
+
+    cdef Py_ssize_t i = size, parent
+    while i > 0:
+        parent = (i - 1) >> 1
+        if not _less(&entry, &heap[parent]):
+            break
+        heap[i] = heap[parent]
+        i = parent
+    heap[i] = entry
+
+
+cdef inline Entry _pop(Entry* heap, Py_ssize_t size) noexcept nogil:
+    """ Remove and return the smallest entry of a heap holding <size> entries """
+
+    cdef Entry top = heap[0]
+    cdef Entry last = heap[size - 1]
+    cdef Py_ssize_t i = 0, child
+    size -= 1
+    while True:
+        child = 2 * i + 1
+        if child >= size:
+            break
+        if child + 1 < size and _less(&heap[child + 1], &heap[child]):
+            child += 1
+        if not _less(&heap[child], &last):
+            break
+        heap[i] = heap[child]
+        i = child
+    if size > 0:
+        heap[i] = last
+    return top
+
+
+cdef inline double _octile(int x1, int y1, int x2, int y2) noexcept nogil:
+    cdef int dx = abs(x1 - x2)
+    cdef int dy = abs(y1 - y2)
+    return (dx + dy) + (SQRT2 - 2) * (dx if dx < dy else dy)
+
+
+cpdef int astar(unsigned char[:, :] blocked, unsigned char[:, :] closed, double[:, ::1] g, int sx, int sy, int ex,
+                int ey, int[:, :, :] parent_out) except -2:
+    """ Run A* from (sx, sy) to (ex, ey), same costs and tie-breaking as AStarSolver.run_A_star
+
+    <closed> receives the expanded squares, <g> (filled with inf) the best g_cost and <parent_out> the parent (x, y)
+    of every reached square.
+    Return the number of expanded squares, or -1 if no path was found.
+    """
+
+    cdef int width = blocked.shape[0]
+    cdef int height = blocked.shape[1]
+
+    # The heap starts small and doubles when full
+    cdef Py_ssize_t capacity = 256
+    cdef Entry* heap = <Entry*> malloc(capacity * sizeof(Entry))
+    cdef Entry* grown
+    if heap == NULL:
+        raise MemoryError()
+
+    cdef Py_ssize_t size = 0
+    cdef long long tiebreak = 0
+    cdef int expanded = 0
+    cdef int x, y, dx, dy, nx, ny
+    cdef double new_g
+    cdef Entry entry
+
+    try:
+        g[sx, sy] = 0.0
+        entry.f = 0.0
+        entry.g = 0.0
+        entry.tiebreak = 0
+        entry.x = sx
+        entry.y = sy
+        _push(heap, size, entry)
+        size += 1
+
+        while size > 0:
+            entry = _pop(heap, size)
+            size -= 1
+            x = entry.x
+            y = entry.y
+
+            # Lazy deletion: skip stale entries superseded by a cheaper push
+            if entry.g > g[x, y]:
+                continue
+
+            if x == ex and y == ey:
+                return expanded
+
+            closed[x, y] = 1
+            expanded += 1
+
+            for dx in range(-1, 2):
+                for dy in range(-1, 2):
+                    if dx == 0 and dy == 0:
+                        continue
+
+                    nx = x + dx
+                    ny = y + dy
+                    if not (0 <= nx < width and 0 <= ny < height):
+                        continue
+
+                    if blocked[nx, ny] or closed[nx, ny]:
+                        continue
+
+                    new_g = g[x, y] + (SQRT2 if dx != 0 and dy != 0 else 1.0)
+                    if new_g >= g[nx, ny]:
+                        continue
+
+                    g[nx, ny] = new_g
+                    parent_out[nx, ny, 0] = x
+                    parent_out[nx, ny, 1] = y
+
+                    if size == capacity:
+                        grown = <Entry*> realloc(heap, 2 * capacity * sizeof(Entry))
+                        if grown == NULL:
+                            raise MemoryError()
+                        heap = grown
+                        capacity *= 2
+
+                    tiebreak += 1
+                    entry.f = new_g + _octile(nx, ny, ex, ey)
+                    entry.g = new_g
+                    entry.tiebreak = tiebreak
+                    entry.x = nx
+                    entry.y = ny
+                    _push(heap, size, entry)
+                    size += 1
+
+        return -1
+    finally:
+        free(heap)
@@ -0,0 +1,155 @@
+import heapq
+import math
+
+import numpy as np
+import pytest
+
+import AStar
+from AStar import AStarSolver, GridNodes, Node
+
+
+def dijkstra_cost(width, height, blocs, start, end):
+    """ Brute-force shortest path cost with the solver's moves, None when the end can't be reached """
+
+    dist = {start: 0.0}
+    heap = [(0.0, start)]
+    while heap:
+        d, (x, y) = heapq.heappop(heap)
+        if (x, y) == end:
+            return d
+        if d > dist[(x, y)]:
+            continue
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                nx, ny = x + dx, y + dy
+                if (dx, dy) == (0, 0) or not (0 <= nx < width and 0 <= ny < height) or (nx, ny) in blocs:
+                    continue
+                nd = d + (math.sqrt(2) if dx and dy else 1.0)
+                if nd < dist.get((nx, ny), math.inf):
+                    dist[(nx, ny)] = nd
+                    heapq.heappush(heap, (nd, (nx, ny)))
+
+    return None
+
+
+def path_cost(path):
+    return sum(math.sqrt(2) if x1 != x2 and y1 != y2 else 1.0 for (x1, y1), (x2, y2) in zip(path, path[1:]))
+
+
+def random_grid(seed):
+    rng = np.random.default_rng(seed)
+    width, height = rng.integers(2, 25, size=2).tolist()
+    start = tuple(rng.integers((width, height)).tolist())
+    end = tuple(rng.integers((width, height)).tolist())
+    blocs = {(x, y) for x, y in zip(*np.nonzero(rng.random((width, height)) < 0.3))}
+    blocs = {(int(x), int(y)) for x, y in blocs} - {start, end}
+    return width, height, blocs, start, end
+
+
+def solve(width, height, blocs, start, end):
+    solver = AStarSolver(GridNodes(width, height), Node(*start), Node(*end))
+    for x, y in blocs:
+        solver.add_bloc(x, y)
+    return solver.run_A_star()
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_path_cost_matches_dijkstra(monkeypatch, seed):
+    monkeypatch.setattr(AStar, "compiled_astar", None)
+    width, height, blocs, start, end = random_grid(seed)
+
+    path = solve(width, height, blocs, start, end)
+    expected = dijkstra_cost(width, height, blocs, start, end)
+
+    if expected is None:
+        assert path is None
+        return
+
+    assert path[0] == start and path[-1] == end
+    assert not blocs & set(path)
+    assert all(max(abs(x1 - x2), abs(y1 - y2)) == 1 for (x1, y1), (x2, y2) in zip(path, path[1:]))
+    assert path_cost(path) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_compiled_core_matches_python(monkeypatch, seed):
+    astar_core = pytest.importorskip("astar_core")
+    width, height, blocs, start, end = random_grid(seed)
+
+    monkeypatch.setattr(AStar, "compiled_astar", None)
+    python_solver = AStarSolver(GridNodes(width, height), Node(*start), Node(*end))
+    monkeypatch.setattr(AStar, "compiled_astar", astar_core.astar)
+    compiled_solver = AStarSolver(GridNodes(width, height), Node(*start), Node(*end))
+    for solver in (python_solver, compiled_solver):
+        for x, y in blocs:
+            solver.add_bloc(x, y)
+
+    monkeypatch.setattr(AStar, "compiled_astar", None)
+    python_path = python_solver.run_A_star()
+    monkeypatch.setattr(AStar, "compiled_astar", astar_core.astar)
+    compiled_path = compiled_solver.run_A_star()
+
+    assert compiled_path == python_path
+    assert np.array_equal(compiled_solver.g, python_solver.g)
+    assert np.array_equal(compiled_solver.closed, python_solver.closed)
+    assert np.array_equal(compiled_solver.parent, python_solver.parent)
+
+
+@pytest.mark.parametrize("compiled", [False, True])
+def test_solver_can_be_rerun(monkeypatch, compiled):
+    if compiled:
+        monkeypatch.setattr(AStar, "compiled_astar", pytest.importorskip("astar_core").astar)
+    else:
+        monkeypatch.setattr(AStar, "compiled_astar", None)
+
+    solver = AStarSolver(GridNodes(5, 5), Node(0, 0), Node(4, 0))
+    assert len(solver.run_A_star()) == 5
+
+    for y in range(4):
+        solver.add_bloc(2, y)
+
+    assert solver.run_A_star() == solve(5, 5, {(2, y) for y in range(4)}, (0, 0), (4, 0))
+    assert len(solver.run_A_star()) == 9
+
+
+def test_add_bloc_rejects_out_of_grid_squares(monkeypatch):
+    monkeypatch.setattr(AStar, "compiled_astar", None)
+    solver = AStarSolver(GridNodes(3, 1), Node(0, 0), Node(2, 0))
+
+    assert not solver.add_bloc(-2, 0)
+    assert not solver.add_bloc(5, 0)
+    assert not solver.add_bloc(0, 0)
+    assert solver.run_A_star() == [(0, 0), (1, 0), (2, 0)]
+
+
+def test_on_step_reports_closed_and_opened_squares(monkeypatch):
+    monkeypatch.setattr(AStar, "compiled_astar", None)
+    steps = []
+    solver = AStarSolver(GridNodes(8, 8), Node(0, 0), Node(7, 5), on_step=lambda *args: steps.append(args))
+    for y in range(1, 8):
+        solver.add_bloc(4, y)
+
+    solver.run_A_star()
+
+    *expansions, last = steps
+    assert last == (7, 5, True, [])
+    assert not any(terminal for _, _, terminal, _ in expansions)
+    assert sorted((x, y) for x, y, _, _ in expansions) == sorted(zip(*np.nonzero(solver.closed)))
+    assert {xy for *_, opened in expansions for xy in opened} == set(zip(*np.nonzero(solver.parent[..., 0] != -1)))
+
+
+@pytest.mark.parametrize("compiled", [False, True])
+@pytest.mark.parametrize("start, end", [((-1, 2), (3, 3)), ((20, 2), (3, 3)), ((0, 0), (3, -1)), ((0, 0), (5, 3))])
+def test_start_and_end_must_be_on_the_grid(monkeypatch, compiled, start, end):
+    if compiled:
+        monkeypatch.setattr(AStar, "compiled_astar", pytest.importorskip("astar_core").astar)
+    else:
+        monkeypatch.setattr(AStar, "compiled_astar", None)
+
+    with pytest.raises(ValueError):
+        AStarSolver(GridNodes(5, 5), Node(*start), Node(*end))
+
+    solver = AStarSolver(GridNodes(5, 5), Node(0, 1), Node(4, 4))
+    solver.start_node, solver.end_node = Node(*start), Node(*end)
+    with pytest.raises(ValueError):
+        solver.run_A_star()